@@ -46,11 +46,14 @@ implementation), while the VERSION is the maximum pxd version that this
 module can read (and the pxd version that it writes).
 '''
 
+import binascii
 import collections
 import datetime
-import enum
+import functools
 import gzip
+import io
 import re
+import string
 import sys
 from xml.sax.saxutils import escape, unescape
 
@@ -65,6 +68,12 @@ __version__ = '1.0.0' # pxd module version
 VERSION = 1.0 # pxd file format version
 
 UTF8 = 'utf-8'
+_READ_BUFFER_SIZE = 128 * 1024
+_GZIP_MAGIC = b'\x1F\x8B'
+
+_WHITESPACE = re.compile(r'\s*')
+_NEGATIVE_NUMBER = re.compile(r'[.eE\d]*')
+_NUMBER_OR_DATE = re.compile(r'\d*([-+.:eETZ][-+.:eETZ\d]*)?')
 
 
 def read(filename_or_filelike, *, warn_is_error=False):
@@ -79,27 +88,28 @@ def read(filename_or_filelike, *, warn_is_error=False):
     If warn_is_error is True warnings raise Error exceptions.
     '''
     data = None
-    tokens, custom, text = _tokenize(
-        filename_or_filelike, warn_is_error=warn_is_error)
-    data = _parse(tokens, text=text, warn_is_error=warn_is_error)
-    return data, custom
+    tokens, lexer = _tokenize(filename_or_filelike,
+                              warn_is_error=warn_is_error)
+    data = _parse(tokens, lexer=lexer, warn_is_error=warn_is_error)
+    return data, lexer.custom
 
 
 def _tokenize(filename_or_filelike, *, warn_is_error=False):
     text = _read_text(filename_or_filelike)
     lexer = _Lexer(warn_is_error=warn_is_error)
     tokens = lexer.tokenize(text)
-    return tokens, lexer.custom, text
+    return tokens, lexer
 
 
 def _read_text(filename_or_filelike):
     if not isinstance(filename_or_filelike, str):
         return filename_or_filelike.read()
-    try:
-        with gzip.open(filename_or_filelike, 'rt', encoding=UTF8) as file:
-            return file.read()
-    except gzip.BadGzipFile:
-        with open(filename_or_filelike, 'rt', encoding=UTF8) as file:
+    # A large buffer means fewer reads of the (possibly compressed) file
+    with open(filename_or_filelike, 'rb',
+              buffering=_READ_BUFFER_SIZE) as raw:
+        if raw.peek(2)[:2] == _GZIP_MAGIC:
+            raw = gzip.GzipFile(fileobj=raw)
+        with io.TextIOWrapper(raw, encoding=UTF8) as file:
             return file.read()
 
 
@@ -108,15 +118,21 @@ class _ErrorMixin:
     def warn(self, message):
         if self.warn_is_error:
             self.error(message)
-        lino = self.text.count('\n', 0, self.pos) + 1
+        lino = self._lino_of(self.pos)
         print(f'warning:{self._what}:{lino}: {message}')
 
 
     def error(self, message):
-        lino = self.text.count('\n', 0, self.pos) + 1
+        lino = self._lino_of(self.pos)
         raise Error(f'{self._what}:{lino}: {message}')
 
 
+    def _lino_of(self, pos):
+        # Line numbers are only needed for warnings and errors so they're
+        # computed on demand rather than tracked while scanning
+        return self.text.count('\n', 0, pos) + 1
+
+
 class _Lexer(_ErrorMixin):
 
     def __init__(self, *, warn_is_error=False):
@@ -133,12 +149,40 @@ class _Lexer(_ErrorMixin):
 
     def tokenize(self, text):
         self.clear()
-        self.text = text
+        self.end = len(text)
+        # The sentinel \0 ends every scan so inner loops needn't check for
+        # the end of the text
+        self.text = text + '\0'
         self.scan_header()
-        while not self.at_end():
-            self.scan_next()
+        return self.scan()
+
+
+    def scan(self):
+        # Tokens are yielded as they're scanned so that the parser can
+        # consume them without the whole token list being held in memory
+        # Attributes used every iteration are aliased to (faster) locals
+        tokens = self.tokens
+        pop = tokens.pop
+        skip_whitespace = _WHITESPACE.match
+        get_scanner = self._SCANNERS.get
+        text = self.text
+        end = self.end
+        while True:
+            # The regex engine skips each run of whitespace in one call
+            pos = skip_whitespace(text, self.pos).end()
+            if pos >= end:
+                break
+            self.pos = pos + 1 # advance past the scanned char
+            c = text[pos]
+            scanner = get_scanner(c)
+            if scanner is not None:
+                scanner(self)
+            else:
+                self.scan_next(c)
+            if tokens: # a scanner adds at most one token
+                yield pop()
         self.add_token(_Kind.EOF)
-        return self.tokens
+        yield tokens.pop()
 
 
     def scan_header(self):
@@ -161,65 +205,78 @@ class _Lexer(_ErrorMixin):
             self.custom = parts[2]
 
 
-    def at_end(self):
-        return self.pos >= len(self.text)
-
-
-    def scan_next(self):
-        c = self.getch()
-        if c.isspace():
-            pass
-        elif c == '[':
-            if self.peek() == '=':
-                self.pos += 1
-                self.add_token(_Kind.TABLE_BEGIN)
-                self.text_kind = _Kind.TABLE_NAME
-            else:
-                self.add_token(_Kind.LIST_BEGIN)
-        elif c == '=':
-            if self.peek() == ']':
-                self.pos += 1
-                self.add_token(_Kind.TABLE_END)
-                self.text_kind = _Kind.STR
-            elif self.text_kind is _Kind.TABLE_FIELD_NAME:
-                self.add_token(_Kind.TABLE_ROWS)
-                self.text_kind = _Kind.STR
-            else:
-                self.error(f'unexpected character encountered: {c!r}')
-        elif c == ']':
-            self.add_token(_Kind.LIST_END)
-        elif c == '{':
-            self.add_token(_Kind.DICT_BEGIN)
-        elif c == '}':
-            self.add_token(_Kind.DICT_END)
-        elif c == '<':
-            self.read_string_or_name()
-        elif c == '(':
-            if self.peek() == ':':
-                self.read_ntuple()
-            else:
-                self.read_bytes()
-        elif c == '-' and self.peek().isdecimal():
-            c = self.getch() # skip the - and get the first digit
-            self.read_negative_number(c)
-        elif c.isdecimal():
-            self.read_positive_number_or_date(c)
-        elif c.isalpha():
+    def scan_next(self, c):
+        # scan() has already tried _SCANNERS so c isn't an ASCII token start
+        if c.isdecimal(): # non-ASCII digit
+            self.read_positive_number_or_date()
+        elif c.isalpha(): # non-ASCII letter
             self.read_const()
         else:
             self.error(f'invalid character encountered: {c!r}')
 
 
+    def read_list_or_table_begin(self):
+        if self.peek() == '=':
+            self.pos += 1
+            self.add_token(_Kind.TABLE_BEGIN)
+            self.text_kind = _Kind.TABLE_NAME
+        else:
+            self.add_token(_Kind.LIST_BEGIN)
+
+
+    def read_table_rows_or_end(self):
+        if self.peek() == ']':
+            self.pos += 1
+            self.add_token(_Kind.TABLE_END)
+            self.text_kind = _Kind.STR
+        elif self.text_kind == _Kind.TABLE_FIELD_NAME:
+            self.add_token(_Kind.TABLE_ROWS)
+            self.text_kind = _Kind.STR
+        else:
+            self.error('unexpected character encountered: \'=\'')
+
+
+    def read_list_end(self):
+        self.add_token(_Kind.LIST_END)
+
+
+    def read_dict_begin(self):
+        self.add_token(_Kind.DICT_BEGIN)
+
+
+    def read_dict_end(self):
+        self.add_token(_Kind.DICT_END)
+
+
+    def read_ntuple_or_bytes(self):
+        if self.peek() == ':':
+            self.read_ntuple()
+        else:
+            self.read_bytes()
+
+
     def read_string_or_name(self):
-        value = self.match_to('>', error_text='unterminated string or name')
-        self.add_token(self.text_kind, unescape(value))
-        if self.text_kind is _Kind.TABLE_NAME:
+        pos = self.pos
+        i = self.text.find('>', pos)
+        if i == -1:
+            self.error('unterminated string or name')
+        value = self.text[pos:i]
+        self.pos = i + 1 # skip past >
+        if '&' in value: # most strs have no entities to unescape
+            value = unescape(value)
+        text_kind = self.text_kind
+        self.tokens.append(_Token(text_kind, value))
+        if text_kind == _Kind.TABLE_NAME:
             self.text_kind = _Kind.TABLE_FIELD_NAME
 
 
     def read_ntuple(self):
-        self.pos += 1 # skip the leading : of (:
-        value = self.match_to(':', error_text='unterminated NTuple')
+        start = self.pos + 1 # skip the leading : of (:
+        i = self.text.find(':', start)
+        if i == -1:
+            self.error('unterminated NTuple')
+        value = self.text[start:i]
+        self.pos = i + 1 # skip past :
         if self.peek() != ')':
             self.error(f'expected \')\', got {self.peek()!r}')
         self.pos += 1 # skip the trailing ) of :)
@@ -236,20 +293,30 @@ class _Lexer(_ErrorMixin):
 
 
     def read_bytes(self):
-        value = self.match_to(')', error_text='unterminated bytes')
-        self.add_token(_Kind.BYTES, bytes.fromhex(value))
+        pos = self.pos
+        i = self.text.find(')', pos)
+        if i == -1:
+            self.error('unterminated bytes')
+        value = self.text[pos:i]
+        self.pos = i + 1 # skip past )
+        try:
+            # a2b_hex() is fastest but only fromhex() skips whitespace
+            value = (binascii.a2b_hex(value) if value.isalnum() else
+                     bytes.fromhex(value))
+            self.add_token(_Kind.BYTES, value)
+        except ValueError as err:
+            self.error(f'invalid bytes: {value}: {err}')
 
 
-    def read_negative_number(self, c):
-        is_real = False
-        start = self.pos - 1
-        while not self.at_end() and (c in '.eE' or c.isdecimal()):
-            if c in '.eE':
-                is_real = True
-            c = self.text[self.pos]
-            self.pos += 1
+    def read_negative_number(self):
+        text = self.text
+        start = self.pos # first digit
+        if not text[start].isdecimal():
+            self.error('invalid character encountered: \'-\'')
+        self.pos = pos = _NEGATIVE_NUMBER.match(text, start).end()
+        text = text[start:pos]
+        is_real = '.' in text or 'e' in text or 'E' in text
         convert = float if is_real else int
-        text = self.text[start:self.pos]
         try:
             value = convert(text)
             self.add_token(_Kind.REAL if is_real else _Kind.INT,
@@ -258,96 +325,84 @@ class _Lexer(_ErrorMixin):
             self.error(f'invalid number: {text}: {err}')
 
 
-    def read_positive_number_or_date(self, c):
-        is_real = is_datetime = False
-        hyphens = 0
-        start = self.pos - 1
-        while not self.at_end() and (c in '-+.:eETZ' or c.isdecimal()):
-            if c in '.eE':
-                is_real = True
-            elif c == '-':
-                hyphens += 1
-            elif c in ':TZ':
-                is_datetime = True
-            c = self.text[self.pos]
-            self.pos += 1
-        self.pos -= 1 # wind back to terminating non-numeric non-date char
-        text = self.text[start:self.pos]
-        if is_datetime:
-            if isoparse is None:
-                convert = datetime.datetime.fromisoformat
-                if text.endswith('Z'):
-                    text = text[:-1] # Py std lib can't handle UTC 'Z'
-            else:
-                convert = isoparse
-            convert = (datetime.datetime.fromisoformat if isoparse is None
-                       else isoparse)
+    def read_positive_number_or_date(self):
+        pos = self.pos
+        # group 1 is None if it is all digits, i.e., an int (the commonest)
+        match = _NUMBER_OR_DATE.match(self.text, pos)
+        self.pos = end = match.end()
+        text = self.text[pos - 1:end]
+        if match.group(1) is None:
+            self.tokens.append(_Token(_Kind.INT, int(text)))
+            return
+        if ':' in text or 'T' in text or 'Z' in text:
+            convert = _datetime
             token = _Kind.DATE_TIME
-        elif hyphens == 2:
-            convert = (datetime.date.fromisoformat if isoparse is None
-                       else isoparse)
+        elif text.count('-') == 2:
+            convert = _date
             token = _Kind.DATE
-        elif is_real:
+        elif '.' in text or 'e' in text or 'E' in text:
             convert = float
             token = _Kind.REAL
         else:
             convert = int
             token = _Kind.INT
         try:
-            value = convert(text)
-            if token is _Kind.DATE and isoparse is not None:
-                value = value.date()
-            self.add_token(token, value)
+            self.add_token(token, convert(text))
         except ValueError as err:
             self.error(f'invalid number or date/time: {text}: {err}')
 
 
     def read_const(self):
-        match = self.match_any_of('no', 'yes', 'null', 'true', 'false')
-        if match == 'null':
-            self.add_token(_Kind.NULL)
-        elif match in {'no', 'false'}:
-            self.add_token(_Kind.BOOL, False)
-        elif match in {'yes', 'true'}:
-            self.add_token(_Kind.BOOL, True)
-        else:
-            i = self.text.find('\n', self.pos)
-            text = self.text[self.pos - 1:i if i > -1 else self.pos + 8]
-            self.error(f'expected const got: {text!r}')
+        text = self.text
+        start = self.pos - 1
+        for const, kind, value in _CONSTS.get(text[start], ()):
+            if text.startswith(const, start):
+                self.pos = start + len(const) # skip past const
+                self.add_token(kind, value)
+                return
+        i = text.find('\n', self.pos)
+        text = text[start:i if i > -1 else min(self.pos + 8, self.end)]
+        self.error(f'expected const got: {text!r}')
 
 
     def peek(self):
-        return '\0' if self.at_end() else self.text[self.pos]
+        return self.text[self.pos]
 
 
-    def getch(self): # advance
-        c = self.text[self.pos]
-        self.pos += 1
-        return c
+    def add_token(self, kind, value=None):
+        self.tokens.append(_VALUELESS_TOKENS[kind] if value is None else
+                           _Token(kind, value))
 
 
-    def match_to(self, c, *, error_text):
-        if not self.at_end():
-            i = self.text.find(c, self.pos)
-            if i > -1:
-                text = self.text[self.pos:i]
-                self.pos = i + 1 # skip past target c
-                return text
-        self.error(error_text)
+    _SCANNERS = { # first char -> scanner
+        '[': read_list_or_table_begin,
+        '=': read_table_rows_or_end,
+        ']': read_list_end,
+        '{': read_dict_begin,
+        '}': read_dict_end,
+        '<': read_string_or_name,
+        '(': read_ntuple_or_bytes,
+        '-': read_negative_number,
+        **dict.fromkeys(string.digits, read_positive_number_or_date),
+        **dict.fromkeys(string.ascii_letters, read_const),
+        }
 
 
-    def match_any_of(self, *targets):
-        if self.at_end():
-            return None
-        start = self.pos - 1
-        for target in targets:
-            if self.text.startswith(target, start):
-                self.pos += len(target) - 1 # skip past target
-                return target
+def _date(text):
+    try: # dates have no offset so the result is the same as isoparse()'s
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        if isoparse is None:
+            raise
+    return isoparse(text).date()
 
 
-    def add_token(self, kind, value=None):
-        self.tokens.append(_Token(kind, value, self.pos))
+def _datetime(text):
+    if isoparse is not None:
+        return isoparse(text)
+    if text.endswith('Z'):
+        text = text[:-1] # Py std lib can't handle UTC 'Z'
+    return datetime.datetime.fromisoformat(text)
 
 
 class Error(Exception):
@@ -356,48 +411,73 @@ class Error(Exception):
 
 class _Token:
 
-    def __init__(self, kind, value=None, pos=-1):
+    __slots__ = ('kind', 'value')
+
+    def __init__(self, kind, value=None):
         self.kind = kind
         self.value = value # literal, i.e., correctly typed item
-        self.pos = pos
 
 
     def __str__(self):
-        parts = [self.kind.name]
-        if self.value is not None:
-            parts.append(f'={self.value!r}')
-        return ''.join(parts)
+        name = _KIND_NAMES[self.kind]
+        if self.value is None:
+            return name
+        return f'{name}={self.value!r}'
 
 
     def __repr__(self):
-        parts = [f'{self.__class__.__name__}({self.kind.name}']
-        if self.value is not None:
-            parts.append(f', {self.value!r}')
-        parts.append(')')
-        return ''.join(parts)
-
-
-@enum.unique
-class _Kind(enum.Enum):
-    TABLE_BEGIN = enum.auto()
-    TABLE_NAME = enum.auto()
-    TABLE_FIELD_NAME = enum.auto()
-    TABLE_ROWS = enum.auto()
-    TABLE_END = enum.auto()
-    LIST_BEGIN = enum.auto()
-    LIST_END = enum.auto()
-    DICT_BEGIN = enum.auto()
-    DICT_END = enum.auto()
-    NTUPLE = enum.auto()
-    NULL = enum.auto()
-    BOOL = enum.auto()
-    INT = enum.auto()
-    REAL = enum.auto()
-    DATE = enum.auto()
-    DATE_TIME = enum.auto()
-    STR = enum.auto()
-    BYTES = enum.auto()
-    EOF = enum.auto()
+        name = _KIND_NAMES[self.kind]
+        if self.value is None:
+            return f'{self.__class__.__name__}({name})'
+        return f'{self.__class__.__name__}({name}, {self.value!r})'
+
+
+class _Kind: # plain ints are much faster to compare than enums
+    TABLE_BEGIN = 1
+    TABLE_NAME = 2
+    TABLE_FIELD_NAME = 3
+    TABLE_ROWS = 4
+    TABLE_END = 5
+    LIST_BEGIN = 6
+    LIST_END = 7
+    DICT_BEGIN = 8
+    DICT_END = 9
+    NTUPLE = 10
+    NULL = 11
+    BOOL = 12
+    INT = 13
+    REAL = 14
+    DATE = 15
+    DATE_TIME = 16
+    STR = 17
+    BYTES = 18
+    EOF = 19
+
+
+_KIND_NAMES = {kind: name for name, kind in vars(_Kind).items()
+               if name.isupper()}
+
+# Tokens are never mutated so those without a value can be shared
+_VALUELESS_TOKENS = {kind: _Token(kind) for kind in _KIND_NAMES}
+
+_CONSTS = { # first char -> ((const, kind, value), ...)
+    'n': (('null', _Kind.NULL, None), ('no', _Kind.BOOL, False)),
+    'y': (('yes', _Kind.BOOL, True),),
+    't': (('true', _Kind.BOOL, True),),
+    'f': (('false', _Kind.BOOL, False),),
+    }
+
+# A set display of _Kind attributes is rebuilt on every evaluation, so the
+# parser's membership tests use these prebuilt sets instead
+_COLLECTION_START_KINDS = frozenset({_Kind.DICT_BEGIN, _Kind.LIST_BEGIN,
+                                     _Kind.TABLE_BEGIN})
+_COLLECTION_END_KINDS = frozenset({_Kind.DICT_END, _Kind.LIST_END,
+                                   _Kind.TABLE_END})
+_TABLE_VALUE_KINDS = frozenset({_Kind.NULL, _Kind.BOOL, _Kind.INT,
+                                _Kind.REAL, _Kind.DATE, _Kind.DATE_TIME,
+                                _Kind.STR, _Kind.BYTES})
+_DICT_KEY_KINDS = frozenset({_Kind.INT, _Kind.DATE, _Kind.DATE_TIME,
+                             _Kind.STR, _Kind.BYTES})
 
 
 class NTuple:
@@ -534,15 +614,21 @@ class Table:
         self.records[-1].append(value)
 
 
+    def _append_value(self, value):
+        # Used by the parser: value is a single value, never a sequence
+        records = self.records
+        if records and len(records[-1]) < len(self.fieldnames):
+            records[-1].append(value) # the commonest case
+        else: # check the name and field names and start a new record
+            self.__iadd__(value)
+
+
     def _make_class(self):
         if not self.name:
             raise Error('can\'t use an unnamed Table')
         if not self.fieldnames:
             raise Error('can\'t create a Table with no field names')
-        self._Class = collections.namedtuple(
-            _canonicalize(self.name, 'Table'),
-            [_canonicalize(name, f'Field{i}')
-             for i, name in enumerate(self.fieldnames, 1)])
+        self._Class = _table_class(self.name, tuple(self.fieldnames))
 
 
     def __iadd__(self, value):
@@ -574,6 +660,14 @@ class Table:
                 f'{len(self.records)} records')
 
 
+@functools.lru_cache(maxsize=256)
+def _table_class(name, fieldnames):
+    return collections.namedtuple(
+        _canonicalize(name, 'Table'),
+        [_canonicalize(fieldname, f'Field{i}')
+         for i, fieldname in enumerate(fieldnames, 1)])
+
+
 def _canonicalize(s, prefix):
     s = re.sub(r'\W+', '', s)
     if not s:
@@ -583,9 +677,9 @@ def _canonicalize(s, prefix):
     return s
 
 
-def _parse(tokens, *, text, warn_is_error=False):
+def _parse(tokens, *, lexer, warn_is_error=False):
     parser = _Parser()
-    return parser.parse(tokens, text)
+    return parser.parse(tokens, lexer)
 
 
 class _Parser(_ErrorMixin):
@@ -598,70 +692,81 @@ class _Parser(_ErrorMixin):
     def clear(self):
         self.keys = []
         self.stack = []
-        self.pos = -1
         self.states = [_Expect.COLLECTION]
 
 
-    def parse(self, tokens, text):
+    @property
+    def pos(self):
+        # Tokens don't store their positions; since they're streamed the
+        # lexer's position is just past the current token
+        return self.lexer.pos
+
+
+    def parse(self, tokens, lexer):
         self.clear()
         self.tokens = tokens
-        self.text = text
+        self.lexer = lexer
+        self.text = lexer.text
         data = None
+        # Local names are faster to look up than class attributes
+        EOF = _Kind.EOF
+        COLLECTION = _Expect.COLLECTION
+        TABLE_NAME = _Expect.TABLE_NAME
+        TABLE_FIELD_NAME = _Expect.TABLE_FIELD_NAME
+        TABLE_VALUE = _Expect.TABLE_VALUE
+        DICT_KEY = _Expect.DICT_KEY
+        DICT_VALUE = _Expect.DICT_VALUE
+        ANY_VALUE = _Expect.ANY_VALUE
+        states = self.states
         for token in tokens:
-            if token.kind is _Kind.EOF:
+            if token.kind == EOF:
                 break
-            self.pos = token.pos
-            state = self.states[-1]
-            if state is _Expect.COLLECTION:
+            state = states[-1]
+            if state == COLLECTION:
                 if not self._is_collection_start(token.kind):
                     self.error(f'expected dict (pxd map), list, or '
                                f'pxd.Table, got {token}')
-                self.states.pop() # _Expect.COLLECTION
+                states.pop() # _Expect.COLLECTION
                 self._on_collection_start(token.kind)
                 data = self.stack[0]
-            elif state is _Expect.TABLE_NAME:
+            elif state == TABLE_NAME:
                 self._handle_table_name(token)
-            elif state is _Expect.TABLE_FIELD_NAME:
+            elif state == TABLE_FIELD_NAME:
                 self._handle_field_name(token)
-            elif state is _Expect.TABLE_VALUE:
+            elif state == TABLE_VALUE:
                 self._handle_table_value(token)
-            elif state is _Expect.DICT_KEY:
+            elif state == DICT_KEY:
                 self._handle_dict_key(token)
-            elif state is _Expect.DICT_VALUE:
+            elif state == DICT_VALUE:
                 self._handle_dict_value(token)
-            elif state is _Expect.EOF:
-                if token.kind is not _Kind.EOF:
-                    self.error(f'expected EOF, got {token}')
-                break # should be redundant
-            elif state is _Expect.ANY_VALUE:
-                if token.kind is not _Kind.EOF:
-                    self._handle_any_value(token)
+            elif state == ANY_VALUE:
+                self._handle_any_value(token)
+            else: # _Expect.EOF
+                self.error(f'expected EOF, got {token}')
         return data
 
 
     def _is_collection_start(self, kind):
-        return kind in {_Kind.DICT_BEGIN, _Kind.LIST_BEGIN,
-                        _Kind.TABLE_BEGIN}
+        return kind in _COLLECTION_START_KINDS
 
 
     def _is_collection_end(self, kind):
-        return kind in {_Kind.DICT_END, _Kind.LIST_END,
-                        _Kind.TABLE_END}
+        return kind in _COLLECTION_END_KINDS
 
 
     def _on_collection_start(self, kind):
-        if kind is _Kind.DICT_BEGIN:
+        if kind == _Kind.DICT_BEGIN:
             self.states.append(_Expect.DICT_KEY)
             self._on_collection_start_helper(dict)
-        elif kind is _Kind.LIST_BEGIN:
+        elif kind == _Kind.LIST_BEGIN:
             self.states.append(_Expect.ANY_VALUE)
             self._on_collection_start_helper(list)
-        elif kind is _Kind.TABLE_BEGIN:
+        elif kind == _Kind.TABLE_BEGIN:
             self.states.append(_Expect.TABLE_NAME)
             self._on_collection_start_helper(Table)
         else:
             self.error('expected to create dict (pxd map), list, or '
-                       f'pxd.Table, not {kind}')
+                       f'pxd.Table, not {_KIND_NAMES[kind]}')
 
 
     def _on_collection_start_helper(self, Class):
@@ -689,40 +794,35 @@ class _Parser(_ErrorMixin):
 
 
     def _handle_table_name(self, token):
-        if token.kind is not _Kind.TABLE_NAME:
+        if token.kind != _Kind.TABLE_NAME:
             self.error(f'expected Table name, got {token}')
         self.stack[-1].name = token.value
         self.states[-1] = _Expect.TABLE_FIELD_NAME
 
 
     def _handle_field_name(self, token):
-        if token.kind is _Kind.TABLE_ROWS:
+        if token.kind == _Kind.TABLE_ROWS:
             self.states[-1] = _Expect.TABLE_VALUE
         else:
-            if token.kind is not _Kind.TABLE_FIELD_NAME:
+            if token.kind != _Kind.TABLE_FIELD_NAME:
                 self.error(f'expected Table field name, got {token}')
             self.stack[-1].append_fieldname(token.value)
 
 
     def _handle_table_value(self, token):
-        if token.kind is _Kind.TABLE_END:
+        if token.kind == _Kind.TABLE_END:
             self._on_collection_end(token)
-        elif token.kind in {
-                _Kind.NULL, _Kind.BOOL, _Kind.INT,
-                _Kind.REAL, _Kind.DATE, _Kind.DATE_TIME,
-                _Kind.STR, _Kind.BYTES}:
-            self.stack[-1] += token.value
+        elif token.kind in _TABLE_VALUE_KINDS:
+            self.stack[-1]._append_value(token.value)
         else:
             self.error('Table values may only be null, bool, int, real, '
                        f'date, datetime, str, or bytes, got {token}')
 
 
     def _handle_dict_key(self, token):
-        if token.kind is _Kind.DICT_END:
+        if token.kind == _Kind.DICT_END:
             self._on_collection_end(token)
-        elif token.kind in {
-                _Kind.INT, _Kind.DATE, _Kind.DATE_TIME,
-                _Kind.STR, _Kind.BYTES}:
+        elif token.kind in _DICT_KEY_KINDS:
             self.keys.append(token.value)
             self.states[-1] = _Expect.DICT_VALUE
         else:
@@ -754,23 +854,22 @@ class _Parser(_ErrorMixin):
             self._on_collection_start(token.kind)
         elif self._is_collection_end(token.kind):
             self.states.pop()
-            if self.states and self.states[-1] is _Expect.DICT_VALUE:
+            if self.states and self.states[-1] == _Expect.DICT_VALUE:
                 self.states[-1] = _Expect.DICT_KEY
             self.stack.pop()
         else: # a scalar
             self.stack[-1].append(token.value)
 
 
-@enum.unique
-class _Expect(enum.Enum):
-    COLLECTION = enum.auto()
-    DICT_KEY = enum.auto()
-    DICT_VALUE = enum.auto()
-    ANY_VALUE = enum.auto()
-    TABLE_NAME = enum.auto()
-    TABLE_FIELD_NAME = enum.auto()
-    TABLE_VALUE = enum.auto()
-    EOF = enum.auto()
+class _Expect:
+    COLLECTION = 1
+    DICT_KEY = 2
+    DICT_VALUE = 3
+    ANY_VALUE = 4
+    TABLE_NAME = 5
+    TABLE_FIELD_NAME = 6
+    TABLE_VALUE = 7
+    EOF = 8
 
 
 def write(filename_or_filelike, *, data, custom='', compress=False,
@@ -794,7 +893,7 @@ def write(filename_or_filelike, *, data, custom='', compress=False,
     complex items to pxd.NTuples, and sets, frozensets, tuples, and
     collections.deques to lists rather than raise an Error.
     '''
-    pad = ' ' * indent
+    pads = _pads(' ' * indent)
     close = False
     if isinstance(filename_or_filelike, str):
         opener = gzip.open if compress else open
@@ -803,7 +902,7 @@ def write(filename_or_filelike, *, data, custom='', compress=False,
     else:
         file = filename_or_filelike
     try:
-        _Writer(file, custom, data, pad, one_way_conversion)
+        _Writer(file, custom, data, pads, one_way_conversion)
     finally:
         if close:
             file.close()
@@ -811,11 +910,12 @@ def write(filename_or_filelike, *, data, custom='', compress=False,
 
 class _Writer:
 
-    def __init__(self, file, custom, data, pad, one_way_conversion):
+    def __init__(self, file, custom, data, pads, one_way_conversion):
         self.file = file
         self.one_way_conversion = one_way_conversion
+        self.spaces = _pads(' ')
         self.write_header(custom)
-        self.write_value(data, pad=pad)
+        self.write_value(data, pads=pads)
 
 
     def write_header(self, custom):
@@ -825,7 +925,7 @@ class _Writer:
         self.file.write('\n')
 
 
-    def write_value(self, item, indent=0, *, pad, dict_value=False):
+    def write_value(self, item, indent=0, *, pads, dict_value=False):
         if isinstance(item, (set, frozenset, tuple, collections.deque)):
             if self.one_way_conversion:
                 item = list(item)
@@ -833,68 +933,72 @@ class _Writer:
                 raise Error(f'can only convert {type(item)} to list if '
                             'one_way_conversion is True')
         if isinstance(item, list):
-            return self.write_list(item, indent, pad=pad,
+            return self.write_list(item, indent, pads=pads,
                                    dict_value=dict_value)
         if isinstance(item, dict):
-            return self.write_dict(item, indent, pad=pad,
+            return self.write_dict(item, indent, pads=pads,
                                    dict_value=dict_value)
         if isinstance(item, Table):
-            return self.write_table(item, indent, pad=pad,
+            return self.write_table(item, indent, pads=pads,
                                     dict_value=dict_value)
-        return self.write_scalar(item, indent=indent, pad=pad,
+        return self.write_scalar(item, indent=indent, pads=pads,
                                  dict_value=dict_value)
 
 
-    def write_list(self, item, indent=0, *, pad, dict_value=False):
-        tab = '' if dict_value else pad * indent
+    def write_list(self, item, indent=0, *, pads, dict_value=False):
+        tab = '' if dict_value else pads[indent]
         if len(item) == 0:
             self.file.write(f'{tab}[]')
             return False
         self.file.write(f'{tab}[')
         indent += 1
+        if indent == len(pads):
+            pads.append(pads[1] * indent)
         is_scalar = _is_scalar(item[0])
         if is_scalar:
-            kwargs = dict(indent=0, pad=' ', dict_value=False)
+            kwargs = dict(indent=0, pads=self.spaces, dict_value=False)
         else:
             self.file.write('\n')
-            kwargs = dict(indent=indent, pad=pad, dict_value=False)
+            kwargs = dict(indent=indent, pads=pads, dict_value=False)
         for value in item:
             self.write_value(value, **kwargs)
             if is_scalar:
                 kwargs['indent'] = 1 # 0 for first item
-        tab = pad * (indent - 1)
+        tab = pads[indent - 1]
         self.file.write(']\n' if is_scalar else f'{tab}]\n')
         return True
 
 
-    def write_dict(self, item, indent=0, *, pad, dict_value=False):
-        tab = '' if dict_value else pad * indent
+    def write_dict(self, item, indent=0, *, pads, dict_value=False):
+        tab = '' if dict_value else pads[indent]
         if len(item) == 0:
             self.file.write(f'{tab}{{}}')
             return False
         elif len(item) == 1:
             self.file.write(f'{tab}{{')
             key, value = list(item.items())[0]
-            self.write_scalar(key, 1, pad=' ')
+            self.write_scalar(key, 1, pads=self.spaces)
             self.file.write(' ')
-            self.write_value(value, 1, pad=' ', dict_value=True)
+            self.write_value(value, 1, pads=self.spaces, dict_value=True)
             self.file.write('}}')
             return False
         self.file.write(f'{tab}{{\n')
         indent += 1
+        if indent == len(pads):
+            pads.append(pads[1] * indent)
         for key, value in item.items():
-            self.write_scalar(key, indent, pad=pad)
+            self.write_scalar(key, indent, pads=pads)
             self.file.write(' ')
-            if not self.write_value(value, indent, pad=pad,
+            if not self.write_value(value, indent, pads=pads,
                                     dict_value=True):
                 self.file.write('\n')
-        tab = pad * (indent - 1)
+        tab = pads[indent - 1]
         self.file.write(f'{tab}}}\n')
         return True
 
 
-    def write_table(self, item, indent=0, *, pad, dict_value=False):
-        tab = '' if dict_value else pad * indent
+    def write_table(self, item, indent=0, *, pads, dict_value=False):
+        tab = '' if dict_value else pads[indent]
         self.file.write(f'{tab}[= <{escape(item.name)}>')
         for name in item.fieldnames:
             self.file.write(f' <{escape(name)}>')
@@ -903,63 +1007,68 @@ class _Writer:
             return False
         self.file.write(' =\n')
         indent += 1
-        for record in item:
-            self.file.write(pad * indent)
-            for value in record:
-                self.write_scalar(value, pad=pad)
-                self.file.write(' ')
-            self.file.write('\n')
-        tab = pad * (indent - 1)
+        if indent == len(pads):
+            pads.append(pads[1] * indent)
+        tab = pads[indent]
+        scalar_to_str = self.scalar_to_str
+        for record in item.records: # no need to create namedtuples here
+            # one write per record; each value is followed by a space
+            row = ' '.join([scalar_to_str(value) for value in record])
+            self.file.write(f'{tab}{row} \n')
+        tab = pads[indent - 1]
         self.file.write(f'{tab}=]\n')
         return True
 
 
-    def write_scalar(self, item, indent=0, *, pad, dict_value=False):
+    def write_scalar(self, item, indent=0, *, pads, dict_value=False):
         if not dict_value:
-            self.file.write(pad * indent)
+            self.file.write(pads[indent])
+        self.file.write(self.scalar_to_str(item))
+        return False
+
+
+    def scalar_to_str(self, item):
         if item is None:
-            self.file.write('null')
-        elif isinstance(item, bool):
-            self.file.write('yes' if item else 'no')
-        elif isinstance(item, int):
-            self.file.write(str(item))
-        elif isinstance(item, float):
-            self.file.write(_realstr(item))
-        elif isinstance(item, (datetime.date, datetime.datetime)):
-            self.file.write(item.isoformat())
-        elif isinstance(item, str):
-            self.file.write(f'<{escape(item)}>')
-        elif isinstance(item, bytes):
-            self.file.write(f'({item.hex().upper()})')
-        elif isinstance(item, bytearray):
+            return 'null'
+        if isinstance(item, bool):
+            return 'yes' if item else 'no'
+        if isinstance(item, int):
+            return str(item)
+        if isinstance(item, float):
+            return _realstr(item)
+        if isinstance(item, (datetime.date, datetime.datetime)):
+            return item.isoformat()
+        if isinstance(item, str):
+            return f'<{escape(item)}>'
+        if isinstance(item, bytes):
+            return f'({item.hex().upper()})'
+        if isinstance(item, bytearray):
             if not self.one_way_conversion:
                 raise Error('can only convert bytearray to bytes if '
                             'one_way_conversion is True')
-            self.file.write(f'({item.hex().upper()})')
-        elif isinstance(item, complex):
+            return f'({item.hex().upper()})'
+        if isinstance(item, complex):
             if not self.one_way_conversion:
                 raise Error('can only convert complex to NTuple if '
                             'one_way_conversion is True')
-            self.file.write(
-                f'(:{_realstr(item.real)} {_realstr(item.imag)}:)')
-        elif isinstance(item, NTuple):
-            self.file.write(item.aspxd)
-        else:
-            print(f'error: ignoring unexpected item of type {type(item)}: '
-                  f'{item!r}', file=sys.stderr)
-        return False
+            return f'(:{_realstr(item.real)} {_realstr(item.imag)}:)'
+        if isinstance(item, NTuple):
+            return item.aspxd
+        print(f'error: ignoring unexpected item of type {type(item)}: '
+              f'{item!r}', file=sys.stderr)
+        return ''
+
+
+def _pads(pad):
+    # Precomputed indentation strings indexed by indent level
+    return [pad * i for i in range(64)]
 
 
 def _realstr(s):
     value = str(s)
-    if '.' not in value:
-        i = value.find('e')
-        if i == -1:
-            i = value.find('E')
-        if i == -1:
-            value += '.0'
-        else:
-            value = value[:i] + '.0' + value[i:]
+    if '.' not in value: # str(float) only ever uses lowercase 'e'
+        mantissa, e, exponent = value.partition('e')
+        value = f'{mantissa}.0{e}{exponent}'
     return value
 
 
@@ -0,0 +1,66 @@
+pxd 1.0 TLM Config
+{
+  <General> {
+    <saved> 2022-03-21
+    <autosave> yes
+    <historysize> -35
+    <volume> 0.7
+    <files> [= <Files> <kind> <filename> =
+      <current> </home/mark/app/rs/tlm/PlaylistsTest.tlm> 
+      <recent1> </home/mark/app/rs/tlm/PlaylistsTest.tlm> 
+      <recent2> </home/mark/data/playlists-all.tlm> 
+    =]
+  }
+  <Window> {
+    <x> 383
+    <y> 124
+    <width> 590
+    <height> 536
+    <scale> 1.1
+  }
+  <Magic> (1F8B)
+  <Nested Dict> {
+    <Classical> [5 yes]
+    <Modern Instrumental> [4 no]
+    <New Acquistions> [1 no]
+    <Nested List of Lists> [
+      [5 <Classical> yes]
+      [4 <Modern Instrumental> no]
+      [1 <New Acquistions> no]
+    ]
+    <Nested Table> [= <Categories> <CID> <Title> <Selected> =
+      5 <Classical> yes 
+      4 <Modern Instrumental> no 
+      1 <New Acquistions> no 
+      2 <Pop> no 
+      3 <Punk> no 
+      7 <Uncategorized> no 
+      6 <Unpopular Pop> no 
+    =]
+    <Nested List of Tables> [
+      [= <Categories> <CID> <Title> <Selected> =
+        5 <Classical> yes 
+        4 <Modern Instrumental> no 
+        1 <New Acquistions> no 
+        2 <Pop> no 
+        3 <Punk> no 
+        7 <Uncategorized> no 
+        6 <Unpopular Pop> no 
+      =]
+      [= <Playlists> <PID> <Title> <CID> <Selected> =
+        4 <ABBA> 2 no 
+        38 <Bach> 5 no 
+        39 <Bartok> 5 no 
+        5 <Beatles> 2 no 
+        40 <Beethoven> 5 no 
+        6 <Blondie> 2 no 
+        52 <Bob Marley> 6 yes 
+        7 <Bruce Springsteen> 2 no 
+        41 <Chopin> 5 yes 
+        37 <Classical> 5 no 
+        8 <David Bowie> 2 no 
+        9 <Dire Straits> 2 no 
+      =]
+    ]
+  }
+}
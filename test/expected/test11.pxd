@@ -0,0 +1,21 @@
+pxd 1.0 Negative numbers before closing brackets
+{
+  <list> [-5]
+  <reals> [1 -2 3.5 -4.25]
+  <dict> {
+    <a> 1
+    <b> -1.5
+  }
+  <nested> {
+    <c> [-7]
+    <d> {
+      <e> 8
+      <f> -8
+    }
+  }
+  <table> [= <Points> <x> <y> =
+    1 -2.5 
+    -3 4.0 
+    5 -6.75 
+  =]
+}
@@ -2,6 +2,7 @@
 # Copyright © 2022 Mark Summerfield. All rights reserved.
 # License: GPLv3
 
+import concurrent.futures
 import filecmp
 import os
 import re
@@ -19,13 +20,20 @@ def main():
         exe = sys.argv[1]
     total = ok = 0
     cleanup()
-    for name in sorted(os.listdir('.'), key=by_number):
-        if os.path.isfile(name) and name.endswith('.pxd'):
+    # scandir()'s entries know if they're files without another stat()
+    names = sorted((entry.name for entry in os.scandir('.')
+                    if entry.is_file() and entry.name.endswith('.pxd')),
+                   key=by_number)
+    # The conversions run in parallel; map() returns them in name order
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=os.cpu_count()) as executor:
+        replies = executor.map(lambda name: convert(exe, name), names)
+        for name, reply in zip(names, replies):
             total += 1
             actual = f'actual/{name}'
             expected = f'expected/{name}'
-            reply = subprocess.call([exe, name, actual])
-            if reply != 0:
+            sys.stdout.write(reply.stdout)
+            if reply.returncode != 0:
                 print(f'{name} FAIL could not output {actual}')
             else:
                 if filecmp.cmp(actual, expected, False):
@@ -38,12 +46,17 @@ def main():
         cleanup()
 
 
+def convert(exe, name):
+    # Output is captured so that each file's output stays together
+    return subprocess.run([exe, name, f'actual/{name}'], text=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+
 def cleanup():
     if os.path.exists('actual'):
-        for name in os.listdir('actual'):
-            name = f'actual/{name}'
-            if os.path.isfile(name) and name.endswith('.pxd'):
-                os.remove(name)
+        for entry in os.scandir('actual'):
+            if entry.is_file() and entry.name.endswith('.pxd'):
+                os.remove(entry.path)
     else:
         os.mkdir('actual')
 